@@ -1,14 +1,43 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request, stream_with_context
+from flask.json.provider import JSONProvider
+import orjson
 import numpy as np
-from datetime import datetime
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.linalg
+import threading
+import functools
+from itertools import chain, combinations
+from collections import defaultdict, namedtuple
+from sqlalchemy import event, func, select, text
+from sqlalchemy.engine import Engine
+from datetime import datetime, date
 import os
 import json
 from flask_cors import CORS
+from werkzeug.exceptions import HTTPException
 
 # ==========================================================
 # Initialize Flask and SQLAlchemy
 # ==========================================================
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (Rust encoder, ~5× stdlib json).
+
+    OPT_SERIALIZE_NUMPY lets endpoints return NumPy arrays/scalars directly;
+    orjson always emits UTF-8, so Chinese dish names are never escaped.
+    """
+
+    _OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self._OPTIONS).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 CORS(
     app,
     resources={r"/*": {"origins": "http://localhost:5173"}}
@@ -18,23 +47,192 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 db_path = os.path.join(basedir, "hackathon_project_test.db")
 app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-# Ensure JSON responses display Chinese characters instead of Unicode escape sequences
-app.config['JSON_AS_ASCII'] = False
-app.json.ensure_ascii = False
+# Keep a small connection pool alive for the threaded dev server
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "pool_size": 8,
+    "max_overflow": 16,
+    "pool_pre_ping": True,
+}
 
 # Use db instance from models.py (avoid duplicate creation)
 from models import db
 db.init_app(app)
 
+
+# WAL journaling lets concurrent readers proceed while a writer is active;
+# applied on every new SQLite connection
+@event.listens_for(Engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
+
 # ==========================================================
 # Import models (after db initialization)
 # ==========================================================
 from models import Dish, Day, Serving
 
 
+# ==========================================================
+# Central error handling
+# ==========================================================
+@app.errorhandler(Exception)
+def handle_unexpected_error(e):
+    """Uniform JSON 500 for anything a route did not handle itself.
+
+    Replaces the per-route try/except Exception blankets so handler bodies
+    stay small and only carry targeted 400/404 handling; deliberate HTTP
+    errors pass through untouched.
+    """
+    if isinstance(e, HTTPException):
+        return e
+    db.session.rollback()  # an aborted write must not poison the session
+    app.logger.exception("Unhandled error")
+    return jsonify({"error": str(e)}), 500
+
+
+# ==========================================================
+# Shared helpers
+# ==========================================================
+@functools.lru_cache(maxsize=4096)
+def image_path_for(name, stored):
+    """Image path for a dish: the stored path, or the /images/<name>.png default.
+
+    The cache returns the same interned string for repeated rows instead of
+    allocating a fresh f-string per request.
+    """
+    return stored or f"/images/{name}.png"
+
+
+# One bit per dish category, for cheap set-cover checks in optimize_menu
+_CATEGORY_BITS = {"staple": 1, "vegetable": 2, "protein": 4, "dairy": 8}
+
+
+# Process-local dish list cache — dishes only change through add_day
+_DISHES_CACHE = {"v": None}
+
+# Plain-tuple dish row for the cache: unlike ORM instances, these never
+# become detached from an expired session between requests
+DishRow = namedtuple("DishRow", ["id", "name", "category", "image_path"])
+
+
+def _get_dishes():
+    """Dish rows ordered by id plus an id → column-index dict, cached between writes."""
+    cached = _DISHES_CACHE["v"]
+    if cached is not None:
+        return cached
+    dishes = [
+        DishRow(*row)
+        for row in db.session.query(
+            Dish.id, Dish.name, Dish.category, Dish.image_path
+        ).order_by(Dish.id)
+    ]
+    cached = (dishes, {d.id: j for j, d in enumerate(dishes)})
+    _DISHES_CACHE["v"] = cached
+    return cached
+
+
 # ==========================================================
 # Core computation function: Build P, M and solve W
 # ==========================================================
+# Memoized (dishes, W) keyed on a cheap DB version token; the Flask debug
+# server is multi-threaded so guard access with a lock
+_WR_CACHE = {"key": None, "value": None}
+_WR_LOCK = threading.Lock()
+
+# Day/serving history as contiguous NumPy arrays for predict_waste_impact,
+# cached with the same version token
+_HIST_CACHE = {"key": None, "value": None}
+_HIST_LOCK = threading.Lock()
+
+# date → (day_id, total_waste) for the by-date endpoints, same token scheme
+_DAY_MAP_CACHE = {"key": None, "value": None}
+_DAY_MAP_LOCK = threading.Lock()
+
+
+def _db_version_token():
+    """Cheap token that changes whenever day/serving data is written."""
+    return db.session.query(
+        db.session.query(func.max(Day.id)).scalar_subquery(),
+        db.session.query(func.count(Day.id)).scalar_subquery(),
+        db.session.query(func.max(Serving.id)).scalar_subquery(),
+    ).one()
+
+
+def _invalidate_waste_rates_cache():
+    _DISHES_CACHE["v"] = None
+    with _WR_LOCK:
+        _WR_CACHE["key"] = None
+        _WR_CACHE["value"] = None
+    with _HIST_LOCK:
+        _HIST_CACHE["key"] = None
+        _HIST_CACHE["value"] = None
+    with _DAY_MAP_LOCK:
+        _DAY_MAP_CACHE["key"] = None
+        _DAY_MAP_CACHE["value"] = None
+
+
+def _get_day_map():
+    """date → (day_id, total_waste) for every recorded day, cached between writes.
+
+    Turns the by-date endpoints' Day lookup into a dict probe instead of a
+    SQL round trip on every request.
+    """
+    key = _db_version_token()
+    with _DAY_MAP_LOCK:
+        if key == _DAY_MAP_CACHE["key"]:
+            return _DAY_MAP_CACHE["value"]
+
+    value = {
+        d: (day_id, waste)
+        for day_id, d, waste in db.session.query(Day.id, Day.date, Day.total_waste)
+    }
+    with _DAY_MAP_LOCK:
+        _DAY_MAP_CACHE["key"] = key
+        _DAY_MAP_CACHE["value"] = value
+    return value
+
+
+def _get_history_arrays():
+    """Load the day/serving history once and keep it as SoA NumPy arrays.
+
+    Returns (day_ids, day_waste, serv_day, serv_dish, serv_qty, n_bins)
+    where n_bins is one past the largest day id, sized for np.bincount.
+    """
+    key = _db_version_token()
+    with _HIST_LOCK:
+        if key == _HIST_CACHE["key"]:
+            return _HIST_CACHE["value"]
+
+    # Core selects returning plain tuples — no ORM instance hydration or
+    # identity-map bookkeeping on the bulk-math path. No ORDER BY either:
+    # the consumer only bincounts and averages over days, so row order is
+    # irrelevant and the sort would be wasted work
+    days = db.session.execute(select(Day.id, Day.total_waste)).all()
+    serving_rows = db.session.execute(
+        select(Serving.day_id, Serving.dish_id, Serving.quantity)
+    ).all()
+
+    n_days = len(days)
+    n_rows = len(serving_rows)
+    day_ids = np.fromiter((d[0] for d in days), dtype=np.int64, count=n_days)
+    day_waste = np.fromiter((d[1] for d in days), dtype=np.float64, count=n_days)
+    serv_day = np.fromiter((r[0] for r in serving_rows), dtype=np.int64, count=n_rows)
+    serv_dish = np.fromiter((r[1] for r in serving_rows), dtype=np.int64, count=n_rows)
+    serv_qty = np.fromiter((r[2] for r in serving_rows), dtype=np.float64, count=n_rows)
+    n_bins = int(day_ids.max()) + 1 if n_days else 1
+
+    value = (day_ids, day_waste, serv_day, serv_dish, serv_qty, n_bins)
+    with _HIST_LOCK:
+        _HIST_CACHE["key"] = key
+        _HIST_CACHE["value"] = value
+    return value
+
+
 def compute_waste_rates():
     """
     Build from database:
@@ -47,43 +245,76 @@ def compute_waste_rates():
     Use numpy's clip function to constrain waste rates to [0,1] interval, ensuring physical reasonableness
     """
     # --------------------------------------------------
-    # 1. Get dish list and fix order
+    # 0. Return the cached solution when nothing has changed
     # --------------------------------------------------
-    dishes = Dish.query.order_by(Dish.id).all()
-    dish_ids = [d.id for d in dishes]
-    n_dishes = len(dishes)
+    key = _db_version_token()
+    with _WR_LOCK:
+        if key == _WR_CACHE["key"]:
+            return _WR_CACHE["value"]
 
     # --------------------------------------------------
-    # 2. Get all dates
+    # 1. Get dish list and fix order (cached between writes)
     # --------------------------------------------------
-    days = Day.query.order_by(Day.id).all()
-    n_days = len(days)
+    dishes, dish_index = _get_dishes()
+    n_dishes = len(dishes)
 
-    # P: n_days × n_dishes
-    P = np.zeros((n_days, n_dishes))
-    M = np.zeros(n_days)
+    # --------------------------------------------------
+    # 2. Get all dates (id + total_waste only)
+    # --------------------------------------------------
+    days_rows = db.session.execute(
+        select(Day.id, Day.total_waste).order_by(Day.id)).all()
+    day_index = {day_id: i for i, (day_id, _) in enumerate(days_rows)}
+    n_days = len(days_rows)
 
     # --------------------------------------------------
-    # 3. Build matrices
+    # 3. Build matrices from a single servings query
     # --------------------------------------------------
-    for i, day in enumerate(days):
-        M[i] = day.total_waste
+    # float32 is plenty for kitchen quantities and halves the memory traffic
+    # of the matrix build and matvecs
+    M = np.fromiter((row[1] for row in days_rows), dtype=np.float32, count=n_days)
 
-        # All menu records for this day
-        servings = Serving.query.filter_by(day_id=day.id).all()
+    # One Core query for all serving records instead of one per day
+    serving_rows = db.session.execute(
+        select(Serving.day_id, Serving.dish_id, Serving.quantity)
+    ).all()
 
-        for s in servings:
-            j = dish_ids.index(s.dish_id)
-            P[i, j] = s.quantity
+    n_servings = len(serving_rows)
+    rows = np.fromiter((day_index[r[0]] for r in serving_rows), dtype=np.int32, count=n_servings)
+    cols = np.fromiter((dish_index[r[1]] for r in serving_rows), dtype=np.int32, count=n_servings)
+    vals = np.fromiter((r[2] for r in serving_rows), dtype=np.float32, count=n_servings)
+
+    # Each day serves only a handful of the catalog, so P is mostly zeros —
+    # keep it sparse instead of allocating a dense n_days × n_dishes block.
+    # The constructor sums duplicate (day, dish) pairs, so repeated serving
+    # rows accumulate rather than overwrite.
+    P = scipy.sparse.csr_matrix((vals, (rows, cols)), shape=(n_days, n_dishes))
 
     # --------------------------------------------------
     # 4. Constrained least squares solution for W (each waste rate between 0-1)
     # --------------------------------------------------
-    # First perform unconstrained least squares solution
-    W_unconstrained, _, _, _ = np.linalg.lstsq(P, M, rcond=None)
+    # Solve the normal equations PᵀP W = PᵀM via Cholesky — far cheaper than
+    # lstsq's full SVD when n_dishes << n_days (the expected regime here)
+    A = (P.T @ P).toarray()  # n_dishes × n_dishes, small and dense
+    b = P.T @ M
+    # Small ridge term scaled off the average diagonal keeps A positive
+    # definite when dishes are always co-served (near rank-deficient P) and
+    # shrinks the wild negative coefficients that clipping used to hide
+    lam = 1e-6 * np.trace(A) / max(n_dishes, 1)
+    A[np.diag_indices_from(A)] += lam
+    try:
+        W_unconstrained = scipy.linalg.cho_solve(scipy.linalg.cho_factor(A), b)
+    except np.linalg.LinAlgError:
+        # Rank-deficient P: fall back to an iterative sparse least-squares solve
+        W_unconstrained = scipy.sparse.linalg.lsmr(P, M)[0]
     
-    # Constrain results to [0,1] interval
-    W = np.clip(W_unconstrained, 0, 1)
+    # Constrain results to [0,1] interval (in place — no extra allocation);
+    # back to float64 at the boundary
+    np.clip(W_unconstrained, 0, 1, out=W_unconstrained)
+    W = W_unconstrained.astype(np.float64)
+
+    with _WR_LOCK:
+        _WR_CACHE["key"] = key
+        _WR_CACHE["value"] = (dishes, W)
 
     return dishes, W
 
@@ -98,7 +329,7 @@ def get_waste_rates():
     result = []
     for dish, w in zip(dishes, W):
         # Prefer stored image path in database, generate default if none
-        image_path = dish.image_path if dish.image_path else f"/images/{dish.name}.png"
+        image_path = image_path_for(dish.name, dish.image_path)
         result.append({
             "dish_id": dish.id,
             "dish_name": dish.name,
@@ -135,30 +366,42 @@ def days_overview():
     ]
     """
     days = Day.query.order_by(Day.date).all()
-    result = []
 
-    for day in days:
-        servings = Serving.query.filter_by(day_id=day.id).all()
-        servings_list = []
-        for s in servings:
-            dish = Dish.query.get(s.dish_id)
-            #Give priority to using the image paths stored in the database. If not available, generate the default path
-            image_path = dish.image_path if dish.image_path else f"/images/{dish.name}.png"
-            servings_list.append({
-                "dish_id": s.dish_id,
-                "dish_name": dish.name,
-                "quantity": s.quantity,
-                "image_path": image_path
-            })
+    # Load every dish and serving once up front instead of querying per row
+    dish_map = {d.id: d for d in Dish.query.all()}
+    servings_by_day = defaultdict(list)
+    for s in Serving.query.all():
+        servings_by_day[s.day_id].append(s)
 
-        result.append({
-            "day_id": day.id,
-            "date": day.date.isoformat(),
-            "total_waste": day.total_waste,
-            "servings": servings_list
-        })
+    # Stream the array one day at a time instead of materializing the whole
+    # response string — peak memory stays at one serialized day no matter
+    # how long the history grows
+    def generate():
+        yield b"["
+        for i, day in enumerate(days):
+            servings_list = []
+            for s in servings_by_day.get(day.id, []):
+                dish = dish_map[s.dish_id]
+                #Give priority to using the image paths stored in the database. If not available, generate the default path
+                image_path = image_path_for(dish.name, dish.image_path)
+                servings_list.append({
+                    "dish_id": s.dish_id,
+                    "dish_name": dish.name,
+                    "quantity": s.quantity,
+                    "image_path": image_path
+                })
 
-    return jsonify(result)
+            if i:
+                yield b","
+            yield orjson.dumps({
+                "day_id": day.id,
+                "date": day.date.isoformat(),
+                "total_waste": day.total_waste,
+                "servings": servings_list
+            })
+        yield b"]"
+
+    return Response(stream_with_context(generate()), mimetype="application/json")
 
 
 # ==========================================================
@@ -184,36 +427,93 @@ def day_detail(date_str):
         ]
     }
     """
-    from datetime import datetime
     try:
-        query_date = datetime.strptime(date_str, "%Y-%m-%d").date()
+        query_date = date.fromisoformat(date_str)
     except ValueError:
         return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
 
-    day = Day.query.filter_by(date=query_date).first()
-    if not day:
+    found = _get_day_map().get(query_date)
+    if found is None:
         return jsonify({"error": f"No data found for date {date_str}"}), 404
+    day_id, total_waste = found
+
+    servings = Serving.query.filter_by(day_id=day_id).all()
+
+    # Resolve all dish names with one IN query instead of one query per serving
+    dish_ids = {s.dish_id for s in servings}
+    dish_map = {d.id: d for d in Dish.query.filter(Dish.id.in_(dish_ids)).all()}
 
-    servings = Serving.query.filter_by(day_id=day.id).all()
     servings_list = []
     for s in servings:
-        dish = Dish.query.get(s.dish_id)
         servings_list.append({
             "dish_id": s.dish_id,
-            "dish_name": dish.name,
+            "dish_name": dish_map[s.dish_id].name,
             "quantity": s.quantity
         })
 
     result = {
-        "day_id": day.id,
-        "date": day.date.isoformat(),
-        "total_waste": day.total_waste,
+        "day_id": day_id,
+        "date": query_date.isoformat(),
+        "total_waste": total_waste,
         "servings": servings_list
     }
 
     return jsonify(result)
 
 
+# ==========================================================
+# API: Query several days in one request
+# ==========================================================
+@app.route("/days/batch", methods=["POST"])
+def days_batch():
+    """
+    Fetch multiple days at once so clients stop looping over /day/<date>
+    Request format (JSON):
+    {
+        "dates": ["2025-11-14", "2025-11-15"]
+    }
+    Return format: list of /day/<date> style objects, ordered by date
+    (dates with no data are skipped)
+    """
+    data = request.get_json()
+    if not data or not isinstance(data.get("dates"), list):
+        return jsonify({"error": "Missing required field: dates"}), 400
+
+    try:
+        dates = [date.fromisoformat(s) for s in data["dates"]]
+    except (TypeError, ValueError):
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+
+    days = Day.query.filter(Day.date.in_(dates)).order_by(Day.date).all()
+    day_ids = [d.id for d in days]
+
+    # Same batched loading pattern as days_overview
+    dish_map = {d.id: d for d in Dish.query.all()}
+    servings_by_day = defaultdict(list)
+    for s in Serving.query.filter(Serving.day_id.in_(day_ids)).all():
+        servings_by_day[s.day_id].append(s)
+
+    result = []
+    for day in days:
+        servings_list = []
+        for s in servings_by_day.get(day.id, []):
+            dish = dish_map[s.dish_id]
+            servings_list.append({
+                "dish_id": s.dish_id,
+                "dish_name": dish.name,
+                "quantity": s.quantity
+            })
+
+        result.append({
+            "day_id": day.id,
+            "date": day.date.isoformat(),
+            "total_waste": day.total_waste,
+            "servings": servings_list
+        })
+
+    return jsonify(result)
+
+
 @app.route("/")
 def index():
     return "Cafeteria Waste Optimization API running!"
@@ -263,16 +563,16 @@ def add_day():
     }
     """
     data = request.get_json()
-    print(f"DEBUG: Received data: {data}")
-    print(f"DEBUG: Data type: {type(data)}")
-    
+    # Lazy %s formatting: nothing is stringified unless DEBUG logging is on
+    app.logger.debug("Received data: %s", data)
+
     # 验证必要字段
     if not data or "date" not in data or "total_waste" not in data or "servings" not in data:
-        print(f"DEBUG: Missing fields check - data: {data}")
+        app.logger.debug("Missing fields check - data: %s", data)
         return jsonify({"error": "Missing required fields: date, total_waste, servings"}), 400
     
     try:
-        query_date = datetime.strptime(data["date"], "%Y-%m-%d").date()
+        query_date = date.fromisoformat(data["date"])
     except ValueError:
         return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
     
@@ -281,72 +581,96 @@ def add_day():
     if existing_day:
         return jsonify({"error": f"Data for date {data['date']} already exists"}), 409
     
-    try:
-        # Create new Day record
-        day = Day(date=query_date, total_waste=data["total_waste"])
-        db.session.add(day)
-        db.session.flush()  # Get day_id but don't commit
-        
-        new_dishes_names = []
-        servings_count = 0
-        
-        # Process each dish and serving quantity
-        for serving_data in data["servings"]:
-            dish_name = serving_data.get("dish_name")
-            quantity = serving_data.get("quantity")
-            image_path = serving_data.get("image_path")  # Optional field
-            category = serving_data.get("category")  # Optional field: category info
-            
-            if not dish_name or quantity is None:
-                db.session.rollback()
-                return jsonify({"error": "Each serving must have 'dish_name' and 'quantity'"}), 400
-            
-            # Validate category if provided
-            valid_categories = ['staple', 'vegetable', 'protein', 'dairy']
-            if category and category not in valid_categories:
-                db.session.rollback()
-                return jsonify({
-                    "error": f"Invalid category '{category}'. Valid categories are: {valid_categories}"
-                }), 400
-            
-            # Query or create dish
-            dish = Dish.query.filter_by(name=dish_name).first()
-            if not dish:
-                # Generate default path if image_path not provided
-                if not image_path:
-                    image_path = f"/images/{dish_name}.png"
-                
-                dish = Dish(name=dish_name, image_path=image_path, category=category)
-                db.session.add(dish)
-                db.session.flush()  # Get dish_id
-                new_dishes_names.append(dish_name)
-            else:
-                # If dish exists, update related fields (if new values provided)
-                if image_path and dish.image_path != image_path:
-                    dish.image_path = image_path
-                if category and dish.category != category:
-                    dish.category = category
-            
-            # Create serving record
-            serving = Serving(day_id=day.id, dish_id=dish.id, quantity=quantity)
-            db.session.add(serving)
-            servings_count += 1
-        
-        # Commit all changes
-        db.session.commit()
-        
-        return jsonify({
-            "success": True,
-            "message": "Day added successfully",
-            "day_id": day.id,
-            "date": day.date.isoformat(),
-            "new_dishes": new_dishes_names,
-            "servings_count": servings_count
-        }), 201
+    # Create new Day record
+    day = Day(date=query_date, total_waste=data["total_waste"])
+    db.session.add(day)
+    db.session.flush()  # Get day_id but don't commit
     
-    except Exception as e:
-        db.session.rollback()
-        return jsonify({"error": f"Failed to add day: {str(e)}"}), 500
+    new_dishes_names = []
+
+    # Validate every serving entry up front
+    valid_categories = ['staple', 'vegetable', 'protein', 'dairy']
+    for serving_data in data["servings"]:
+        dish_name = serving_data.get("dish_name")
+        quantity = serving_data.get("quantity")
+        category = serving_data.get("category")  # Optional field: category info
+
+        if not dish_name or quantity is None:
+            db.session.rollback()
+            return jsonify({"error": "Each serving must have 'dish_name' and 'quantity'"}), 400
+
+        # Validate category if provided
+        if category and category not in valid_categories:
+            db.session.rollback()
+            return jsonify({
+                "error": f"Invalid category '{category}'. Valid categories are: {valid_categories}"
+            }), 400
+
+    # Resolve all dish names with one IN query instead of one per serving
+    names = [serving_data["dish_name"] for serving_data in data["servings"]]
+    dishes_by_name = {d.name: d for d in Dish.query.filter(Dish.name.in_(names)).all()}
+
+    new_dishes = []
+    for serving_data in data["servings"]:
+        dish_name = serving_data["dish_name"]
+        image_path = serving_data.get("image_path")  # Optional field
+        category = serving_data.get("category")
+
+        dish = dishes_by_name.get(dish_name)
+        if not dish:
+            # Generate default path if image_path not provided
+            if not image_path:
+                image_path = f"/images/{dish_name}.png"
+
+            dish = Dish(name=dish_name, image_path=image_path, category=category)
+            dishes_by_name[dish_name] = dish
+            new_dishes.append(dish)
+            new_dishes_names.append(dish_name)
+        else:
+            # If dish exists, update related fields (if new values provided)
+            if image_path and dish.image_path != image_path:
+                dish.image_path = image_path
+            elif not dish.image_path:
+                # Materialize the default path so read endpoints can use
+                # the stored value instead of re-deriving it per request
+                dish.image_path = f"/images/{dish_name}.png"
+            if category and dish.category != category:
+                dish.category = category
+
+    if new_dishes:
+        db.session.add_all(new_dishes)
+        db.session.flush()  # Get dish ids
+
+    # Insert all serving records with a single multi-row INSERT
+    serving_rows = [
+        {
+            "day_id": day.id,
+            "dish_id": dishes_by_name[serving_data["dish_name"]].id,
+            "quantity": serving_data["quantity"]
+        }
+        for serving_data in data["servings"]
+    ]
+    if serving_rows:
+        db.session.execute(Serving.__table__.insert(), serving_rows)
+    servings_count = len(serving_rows)
+
+    # Commit all changes
+    db.session.commit()
+    _invalidate_waste_rates_cache()
+    # Re-solve at write time: days are added rarely and read endpoints hit
+    # compute_waste_rates constantly, so pay the rebuild here and let every
+    # read until the next write land on a warm cache
+    compute_waste_rates()
+
+    return jsonify({
+        "success": True,
+        "message": "Day added successfully",
+        "day_id": day.id,
+        "date": day.date.isoformat(),
+        "new_dishes": new_dishes_names,
+        "servings_count": servings_count
+    }), 201
+
 
 
 # ==========================================================
@@ -382,63 +706,54 @@ def get_dishes_waste_rates():
         "order_by": "waste_rate"
     }
     """
-    try:
-        # Get query parameters
-        sort_order = request.args.get('sort', 'asc').lower()
-        order_by = request.args.get('order_by', 'waste_rate').lower()
-        
-        # Validate parameters
-        if sort_order not in ['asc', 'desc']:
-            return jsonify({"error": "Invalid sort parameter. Use 'asc' or 'desc'"}), 400
-        
-        if order_by not in ['waste_rate', 'name']:
-            return jsonify({"error": "Invalid order_by parameter. Use 'waste_rate' or 'name'"}), 400
-        
-        # First calculate waste rates
-        try:
-            dishes, waste_rates = compute_waste_rates()
-            
-            # Build waste rate dictionary
-            waste_rates_dict = {}
-            for dish, rate in zip(dishes, waste_rates):
-                waste_rates_dict[dish.name] = rate
-        except Exception as e:
-            return jsonify({"error": f"Failed to compute waste rates: {str(e)}"}), 500
-        
-        # Get all dishes
-        dishes = Dish.query.all()
-        
-        # Build result list
-        dishes_data = []
-        for dish in dishes:
-            waste_rate = waste_rates_dict.get(dish.name, 0.0)  # Default to 0 if no waste rate calculated
-            # Prefer stored image path in database, generate default if none
-            image_path = dish.image_path if dish.image_path else f"/images/{dish.name}.png"
-            
-            dishes_data.append({
-                "id": dish.id,
-                "name": dish.name,
-                "waste_rate": round(waste_rate, 4),  # Keep 4 decimal places
-                "image_path": image_path
-            })
-        
-        # Sort
-        if order_by == 'waste_rate':
-            dishes_data.sort(key=lambda x: x['waste_rate'], reverse=(sort_order == 'desc'))
-        else:  # order_by == 'name'
-            dishes_data.sort(key=lambda x: x['name'], reverse=(sort_order == 'desc'))
-        
-        result = {
-            "dishes": dishes_data,
-            "total_count": len(dishes_data),
-            "sort_order": sort_order,
-            "order_by": order_by
+    # Get query parameters
+    sort_order = request.args.get('sort', 'asc').lower()
+    order_by = request.args.get('order_by', 'waste_rate').lower()
+    
+    # Validate parameters
+    if sort_order not in ['asc', 'desc']:
+        return jsonify({"error": "Invalid sort parameter. Use 'asc' or 'desc'"}), 400
+    
+    if order_by not in ['waste_rate', 'name']:
+        return jsonify({"error": "Invalid order_by parameter. Use 'waste_rate' or 'name'"}), 400
+    
+    # First calculate waste rates
+    dishes, waste_rates = compute_waste_rates()
+
+    # Round all rates in one C-level pass (4 decimal places)
+    rounded = np.round(waste_rates, 4).tolist()
+
+    # dishes and rates are aligned — order them directly instead of
+    # re-querying Dish and matching rows up by name
+    if order_by == 'waste_rate':
+        order = np.argsort(waste_rates, kind='stable')
+        if sort_order == 'desc':
+            order = order[::-1]
+        ordered = [(dishes[i], rounded[i]) for i in order]
+    else:  # order_by == 'name'
+        ordered = sorted(zip(dishes, rounded), key=lambda t: t[0].name,
+                         reverse=(sort_order == 'desc'))
+
+    # Build result list
+    dishes_data = [
+        {
+            "id": dish.id,
+            "name": dish.name,
+            "waste_rate": waste_rate,
+            "image_path": image_path_for(dish.name, dish.image_path)
         }
-        
-        return jsonify(result)
+        for dish, waste_rate in ordered
+    ]
+
+    result = {
+        "dishes": dishes_data,
+        "total_count": len(dishes_data),
+        "sort_order": sort_order,
+        "order_by": order_by
+    }
     
-    except Exception as e:
-        return jsonify({"error": f"Failed to get dishes waste rates: {str(e)}"}), 500
+    return jsonify(result)
+
 
 
 # ==========================================================
@@ -482,145 +797,105 @@ def predict_waste_impact():
         }
     }
     """
-    try:
-        data = request.get_json()
-        
-        # Validate required fields
-        if not data or "dish_name" not in data or "adjustment_percentage" not in data:
-            return jsonify({"error": "Missing required fields: dish_name, adjustment_percentage"}), 400
-        
-        dish_name = data["dish_name"]
-        adjustment_percentage = data["adjustment_percentage"]
-        
-        # Validate adjustment percentage range
-        if not isinstance(adjustment_percentage, (int, float)) or adjustment_percentage < 0 or adjustment_percentage > 200:
-            return jsonify({"error": "adjustment_percentage must be between 0 and 200"}), 400
-        
-        # Find dish
-        dish = Dish.query.filter_by(name=dish_name).first()
-        if not dish:
-            return jsonify({"error": f"Dish '{dish_name}' not found"}), 404
-        
-        # Get current waste rate
-        try:
-            dishes, waste_rates = compute_waste_rates()
-            dish_waste_rate = None
-            for d, rate in zip(dishes, waste_rates):
-                if d.id == dish.id:
-                    dish_waste_rate = rate
-                    break
-            
-            if dish_waste_rate is None:
-                return jsonify({"error": f"Could not compute waste rate for dish '{dish_name}'"}), 500
-        except Exception as e:
-            return jsonify({"error": f"Failed to compute current waste rates: {str(e)}"}), 500
-        
-        # Get all historical dates
-        days = Day.query.order_by(Day.date).all()
-        
-        # Statistical variables
-        total_original_dish_serving = 0
-        total_original_waste = 0
-        total_original_serving = 0
-        total_predicted_dish_serving = 0
-        total_predicted_waste = 0
-        total_predicted_serving = 0
-        valid_days = 0
-        
-        adjustment_factor = adjustment_percentage / 100.0
-        
-        # Calculate for each day and accumulate
-        for day in days:
-            # Get dish serving status for this day
-            servings = Serving.query.filter_by(day_id=day.id).all()
-            
-            # Find target dish serving quantity
-            target_serving = None
-            day_total_serving = 0
-            for serving in servings:
-                day_total_serving += serving.quantity
-                if serving.dish_id == dish.id:
-                    target_serving = serving
-            
-            # Skip if target dish was not served on this day
-            if not target_serving:
-                continue
-            
-            valid_days += 1
-            
-            # Accumulate original data
-            original_dish_serving = target_serving.quantity
-            original_total_waste = day.total_waste
-            original_total_serving = day_total_serving
-            
-            total_original_dish_serving += original_dish_serving
-            total_original_waste += original_total_waste
-            total_original_serving += original_total_serving
-            
-            # Calculate adjusted data and accumulate
-            predicted_dish_serving = original_dish_serving * adjustment_factor
-            
-            # Predict waste change: original serving waste - new serving waste
-            original_dish_waste = original_dish_serving * dish_waste_rate
-            predicted_dish_waste = predicted_dish_serving * dish_waste_rate
-            waste_change = predicted_dish_waste - original_dish_waste
-            
-            predicted_total_waste = original_total_waste + waste_change
-            predicted_total_serving = original_total_serving - original_dish_serving + predicted_dish_serving
-            
-            total_predicted_dish_serving += predicted_dish_serving
-            total_predicted_waste += predicted_total_waste
-            total_predicted_serving += predicted_total_serving
-        
-        if valid_days == 0:
-            return jsonify({"error": f"No serving data found for dish '{dish_name}' in any historical records"}), 404
-        
-        # Calculate averages
-        avg_original_dish_serving = total_original_dish_serving / valid_days
-        avg_original_waste = total_original_waste / valid_days
-        avg_original_serving = total_original_serving / valid_days
-        avg_original_waste_rate = avg_original_waste / avg_original_serving if avg_original_serving > 0 else 0
-        
-        avg_predicted_dish_serving = total_predicted_dish_serving / valid_days
-        avg_predicted_waste = total_predicted_waste / valid_days
-        avg_predicted_serving = total_predicted_serving / valid_days
-        avg_predicted_waste_rate = avg_predicted_waste / avg_predicted_serving if avg_predicted_serving > 0 else 0
-        
-        # Calculate average change amounts
-        avg_waste_reduction = avg_original_waste - avg_predicted_waste
-        avg_waste_rate_reduction = avg_original_waste_rate - avg_predicted_waste_rate
-        avg_serving_reduction = avg_original_serving - avg_predicted_serving
-        
-        result = {
-            "dish_name": dish_name,
-            "adjustment_percentage": adjustment_percentage,
-            "current_waste_rate": round(float(dish_waste_rate), 4),
-            "analysis": {
-                "total_days_analyzed": valid_days,
-                "average_original": {
-                    "dish_serving": round(avg_original_dish_serving, 2),
-                    "total_waste": round(avg_original_waste, 2),
-                    "total_serving": round(avg_original_serving, 2),
-                    "waste_rate": round(avg_original_waste_rate, 4)
-                },
-                "average_predicted": {
-                    "dish_serving": round(avg_predicted_dish_serving, 2),
-                    "total_waste": round(avg_predicted_waste, 2),
-                    "total_serving": round(avg_predicted_serving, 2),
-                    "waste_rate": round(avg_predicted_waste_rate, 4)
-                },
-                "daily_average_changes": {
-                    "daily_waste_reduction": round(avg_waste_reduction, 2),
-                    "daily_waste_rate_reduction": round(avg_waste_rate_reduction, 4),
-                    "daily_serving_reduction": round(avg_serving_reduction, 2)
-                }
+    data = request.get_json()
+    
+    # Validate required fields
+    if not data or "dish_name" not in data or "adjustment_percentage" not in data:
+        return jsonify({"error": "Missing required fields: dish_name, adjustment_percentage"}), 400
+    
+    dish_name = data["dish_name"]
+    adjustment_percentage = data["adjustment_percentage"]
+    
+    # Validate adjustment percentage range
+    if not isinstance(adjustment_percentage, (int, float)) or adjustment_percentage < 0 or adjustment_percentage > 200:
+        return jsonify({"error": "adjustment_percentage must be between 0 and 200"}), 400
+    
+    # Find dish
+    dish = Dish.query.filter_by(name=dish_name).first()
+    if not dish:
+        return jsonify({"error": f"Dish '{dish_name}' not found"}), 404
+    
+    # Get current waste rate — the cached id → index dict from
+    # _get_dishes() replaces a linear scan over the dish list
+    dishes, waste_rates = compute_waste_rates()
+    _, dish_index = _get_dishes()
+    col = dish_index.get(dish.id)
+    if col is None:
+        return jsonify({"error": f"Could not compute waste rate for dish '{dish_name}'"}), 500
+    dish_waste_rate = waste_rates[col]
+    
+    # Day/serving history as cached SoA arrays — no SQL on a warm cache
+    day_ids, day_waste, serv_day, serv_dish, serv_qty, n_bins = _get_history_arrays()
+
+    adjustment_factor = adjustment_percentage / 100.0
+
+    # Vectorized per-day aggregation: bincount by day id gives each day's
+    # total serving and the target dish's quantity in two C-level passes
+    day_totals = np.bincount(serv_day, weights=serv_qty, minlength=n_bins)
+    target = serv_dish == dish.id
+    target_qty = np.bincount(serv_day[target], weights=serv_qty[target], minlength=n_bins)
+    target_count = np.bincount(serv_day[target], minlength=n_bins)
+
+    # Only keep days on which the target dish was actually served
+    valid = target_count[day_ids] > 0
+    valid_days = int(np.count_nonzero(valid))
+    if valid_days == 0:
+        return jsonify({"error": f"No serving data found for dish '{dish_name}' in any historical records"}), 404
+
+    orig_qty = target_qty[day_ids][valid]
+    orig_waste = day_waste[valid]
+    orig_total = day_totals[day_ids][valid]
+
+    # Per-day arithmetic as a handful of vector ops instead of a Python loop
+    pred_qty = orig_qty * adjustment_factor
+    waste_change = (pred_qty - orig_qty) * dish_waste_rate
+    pred_waste = orig_waste + waste_change
+    pred_total = orig_total - orig_qty + pred_qty
+
+    # Calculate averages
+    avg_original_dish_serving = float(orig_qty.mean())
+    avg_original_waste = float(orig_waste.mean())
+    avg_original_serving = float(orig_total.mean())
+    avg_original_waste_rate = avg_original_waste / avg_original_serving if avg_original_serving > 0 else 0
+
+    avg_predicted_dish_serving = float(pred_qty.mean())
+    avg_predicted_waste = float(pred_waste.mean())
+    avg_predicted_serving = float(pred_total.mean())
+    avg_predicted_waste_rate = avg_predicted_waste / avg_predicted_serving if avg_predicted_serving > 0 else 0
+
+    # Calculate average change amounts
+    avg_waste_reduction = avg_original_waste - avg_predicted_waste
+    avg_waste_rate_reduction = avg_original_waste_rate - avg_predicted_waste_rate
+    avg_serving_reduction = avg_original_serving - avg_predicted_serving
+    
+    result = {
+        "dish_name": dish_name,
+        "adjustment_percentage": adjustment_percentage,
+        "current_waste_rate": round(float(dish_waste_rate), 4),
+        "analysis": {
+            "total_days_analyzed": valid_days,
+            "average_original": {
+                "dish_serving": round(avg_original_dish_serving, 2),
+                "total_waste": round(avg_original_waste, 2),
+                "total_serving": round(avg_original_serving, 2),
+                "waste_rate": round(avg_original_waste_rate, 4)
+            },
+            "average_predicted": {
+                "dish_serving": round(avg_predicted_dish_serving, 2),
+                "total_waste": round(avg_predicted_waste, 2),
+                "total_serving": round(avg_predicted_serving, 2),
+                "waste_rate": round(avg_predicted_waste_rate, 4)
+            },
+            "daily_average_changes": {
+                "daily_waste_reduction": round(avg_waste_reduction, 2),
+                "daily_waste_rate_reduction": round(avg_waste_rate_reduction, 4),
+                "daily_serving_reduction": round(avg_serving_reduction, 2)
             }
         }
-        
-        return jsonify(result)
+    }
     
-    except Exception as e:
-        return jsonify({"error": f"Failed to predict waste impact: {str(e)}"}), 500
+    return jsonify(result)
+
 
 
 # ==========================================================
@@ -646,50 +921,53 @@ def get_top_dish_by_date(date_str):
         "total_serving": 68.2
     }
     """
+    # Validate date format
     try:
-        # Validate date format
-        try:
-            query_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
-        
-        # Find data for this date
-        day = Day.query.filter_by(date=query_date).first()
-        if not day:
-            return jsonify({"error": f"No data found for date {date_str}"}), 404
-        
-        # Get all dish serving data for this day
-        servings = Serving.query.filter_by(day_id=day.id).all()
-        if not servings:
-            return jsonify({"error": f"No serving data found for date {date_str}"}), 404
-        
-        # Find dish with highest serving quantity
-        max_serving = max(servings, key=lambda x: x.quantity)
-        top_dish = Dish.query.get(max_serving.dish_id)
-        
-        # Calculate statistics
-        total_dishes = len(servings)
-        total_serving = sum(serving.quantity for serving in servings)
-        
-        # Prefer stored image path in database, generate default if none
-        image_path = top_dish.image_path if top_dish.image_path else f"/images/{top_dish.name}.png"
-        
-        result = {
-            "date": day.date.isoformat(),
-            "top_dish": {
-                "dish_id": top_dish.id,
-                "dish_name": top_dish.name,
-                "quantity": round(max_serving.quantity, 2),
-                "image_path": image_path
-            },
-            "total_dishes": total_dishes,
-            "total_serving": round(total_serving, 2)
-        }
-        
-        return jsonify(result)
+        query_date = date.fromisoformat(date_str)
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    
+    # Find data for this date
+    found = _get_day_map().get(query_date)
+    if found is None:
+        return jsonify({"error": f"No data found for date {date_str}"}), 404
+    day_id, _ = found
+
+    # Let SQL return the top serving (joined to its dish) instead of
+    # hydrating every row and scanning in Python
+    top = (
+        db.session.query(Serving, Dish)
+        .join(Dish, Dish.id == Serving.dish_id)
+        .filter(Serving.day_id == day_id)
+        .order_by(Serving.quantity.desc())
+        .first()
+    )
+    if top is None:
+        return jsonify({"error": f"No serving data found for date {date_str}"}), 404
+    max_serving, top_dish = top
+
+    # Statistics via one aggregate query
+    total_dishes, total_serving = db.session.query(
+        func.count(Serving.id), func.sum(Serving.quantity)
+    ).filter(Serving.day_id == day_id).one()
+    
+    # Prefer stored image path in database, generate default if none
+    image_path = image_path_for(top_dish.name, top_dish.image_path)
+    
+    result = {
+        "date": query_date.isoformat(),
+        "top_dish": {
+            "dish_id": top_dish.id,
+            "dish_name": top_dish.name,
+            "quantity": round(max_serving.quantity, 2),
+            "image_path": image_path
+        },
+        "total_dishes": total_dishes,
+        "total_serving": round(total_serving, 2)
+    }
     
-    except Exception as e:
-        return jsonify({"error": f"Failed to get top dish: {str(e)}"}), 500
+    return jsonify(result)
+
 
 
 # ==========================================================
@@ -698,7 +976,7 @@ def get_top_dish_by_date(date_str):
 @app.route("/optimize_menu", methods=["POST"])
 def optimize_menu():
     """
-    Use linear programming to optimize daily dish serving quantities, objective is to minimize waste rate
+    Optimize daily dish serving quantities, objective is to minimize waste rate
     
     Request format (JSON):
     {
@@ -724,7 +1002,7 @@ def optimize_menu():
     - available_dishes=[1,2,3,4,5] defines candidate dish pool (5 dishes)
     - dish_constraints must define constraints for all 5 dishes
     - num_dishes=3 means select 3 dishes from these 5 dishes
-    - Algorithm enumerates all C(5,3)=10 combinations, optimizes each with linear programming
+    - Algorithm enumerates all C(5,3)=10 combinations, solves each in closed form
     - Finally returns optimal solution with lowest waste rate
     
     Return format (JSON):
@@ -748,256 +1026,216 @@ def optimize_menu():
         }
     }
     """
-    try:
-        from scipy.optimize import linprog
-        from itertools import combinations
-        
-        data = request.get_json()
-        
-        # Validate required fields
-        if not data:
-            return jsonify({"error": "Missing request body"}), 400
-        
-        if "total_quantity_range" not in data:
-            return jsonify({"error": "Missing required field: total_quantity_range"}), 400
+    data = request.get_json()
+    
+    # Validate required fields
+    if not data:
+        return jsonify({"error": "Missing request body"}), 400
+    
+    if "total_quantity_range" not in data:
+        return jsonify({"error": "Missing required field: total_quantity_range"}), 400
+    
+    if "num_dishes" not in data:
+        return jsonify({"error": "Missing required field: num_dishes"}), 400
         
-        if "num_dishes" not in data:
-            return jsonify({"error": "Missing required field: num_dishes"}), 400
+    if "dish_constraints" not in data:
+        return jsonify({"error": "Missing required field: dish_constraints"}), 400
+    
+    total_qty_min, total_qty_max = data["total_quantity_range"]
+    num_dishes = data["num_dishes"]
+    dish_constraints = data["dish_constraints"]
+    category_requirements = data.get("category_requirements", {})
+    available_dish_ids = data.get("available_dishes", None)
+    
+    # Validate parameter reasonableness
+    if total_qty_min >= total_qty_max:
+        return jsonify({"error": "Invalid total_quantity_range: min must be less than max"}), 400
+    
+    if num_dishes <= 0:
+        return jsonify({"error": "num_dishes must be positive"}), 400
+    
+    if not dish_constraints:
+        return jsonify({"error": "dish_constraints cannot be empty"}), 400
+    
+    # Get waste rate data
+    dishes, waste_rates = compute_waste_rates()
+
+    # Build candidate dish pool
+    if available_dish_ids:
+        # Use specified dish ID list
+        candidate_dishes = []
+        candidate_waste_rates = []
+        
+        for dish_id in available_dish_ids:
+            # Find corresponding dish object
+            dish_obj = None
+            dish_waste_rate = None
+            for i, dish in enumerate(dishes):
+                if dish.id == dish_id:
+                    dish_obj = dish
+                    dish_waste_rate = waste_rates[i]
+                    break
             
-        if "dish_constraints" not in data:
-            return jsonify({"error": "Missing required field: dish_constraints"}), 400
-        
-        total_qty_min, total_qty_max = data["total_quantity_range"]
-        num_dishes = data["num_dishes"]
-        dish_constraints = data["dish_constraints"]
-        category_requirements = data.get("category_requirements", {})
-        available_dish_ids = data.get("available_dishes", None)
-        
-        # Validate parameter reasonableness
-        if total_qty_min >= total_qty_max:
-            return jsonify({"error": "Invalid total_quantity_range: min must be less than max"}), 400
-        
-        if num_dishes <= 0:
-            return jsonify({"error": "num_dishes must be positive"}), 400
-        
-        if not dish_constraints:
-            return jsonify({"error": "dish_constraints cannot be empty"}), 400
-        
-        # Get waste rate data
-        try:
-            dishes, waste_rates = compute_waste_rates()
-        except Exception as e:
-            return jsonify({"error": f"Failed to compute waste rates: {str(e)}"}), 500
-        
-        # Build candidate dish pool
-        if available_dish_ids:
-            # Use specified dish ID list
-            candidate_dishes = []
-            candidate_waste_rates = []
+            if dish_obj is None:
+                return jsonify({"error": f"Dish with ID {dish_id} not found"}), 400
             
-            for dish_id in available_dish_ids:
-                # Find corresponding dish object
-                dish_obj = None
-                dish_waste_rate = None
-                for i, dish in enumerate(dishes):
-                    if dish.id == dish_id:
-                        dish_obj = dish
-                        dish_waste_rate = waste_rates[i]
-                        break
-                
-                if dish_obj is None:
-                    return jsonify({"error": f"Dish with ID {dish_id} not found"}), 400
-                
-                candidate_dishes.append(dish_obj)
-                candidate_waste_rates.append(dish_waste_rate)
+            candidate_dishes.append(dish_obj)
+            candidate_waste_rates.append(dish_waste_rate)
+    else:
+        # Use all dishes as candidates
+        candidate_dishes = dishes
+        candidate_waste_rates = waste_rates
+    
+    # Validate constraint definitions: each dish in candidate pool must be defined in dish_constraints
+    missing_constraints = []
+    invalid_constraints = []
+    
+    for dish in candidate_dishes:
+        dish_id_str = str(dish.id)
+        if dish_id_str not in dish_constraints:
+            missing_constraints.append(dish_id_str)
         else:
-            # Use all dishes as candidates
-            candidate_dishes = dishes
-            candidate_waste_rates = waste_rates
-        
-        # Validate constraint definitions: each dish in candidate pool must be defined in dish_constraints
-        missing_constraints = []
-        invalid_constraints = []
-        
-        for dish in candidate_dishes:
-            dish_id_str = str(dish.id)
-            if dish_id_str not in dish_constraints:
-                missing_constraints.append(dish_id_str)
-            else:
-                constraint = dish_constraints[dish_id_str]
-                if "min" not in constraint or "max" not in constraint:
-                    invalid_constraints.append(f"Dish {dish_id_str} missing min or max constraint")
-                elif constraint["min"] >= constraint["max"]:
-                    invalid_constraints.append(f"Dish {dish_id_str} invalid constraint: min must be less than max")
-        
-        if missing_constraints:
-            return jsonify({
-                "error": f"Missing dish_constraints for candidate dishes: {missing_constraints}. "
-                        f"All candidate dishes must have constraints defined."
-            }), 400
-        
-        if invalid_constraints:
-            return jsonify({"error": f"Invalid constraints: {invalid_constraints}"}), 400
-        
-        # Check if candidate dish count is sufficient
-        if len(candidate_dishes) < num_dishes:
-            return jsonify({
-                "error": f"Not enough candidate dishes. Need {num_dishes}, have {len(candidate_dishes)} candidate dishes"
-            }), 400
-        
-        # Function to check category requirements
-        def check_category_requirements_func(dishes_list):
-            if not category_requirements:
-                return True
-            
-            categories_present = set(dish.category for dish in dishes_list if dish.category)
-            
-            if category_requirements.get("require_staple", False) and "staple" not in categories_present:
-                return False
-            if category_requirements.get("require_vegetable", False) and "vegetable" not in categories_present:
-                return False
-            if category_requirements.get("require_protein", False) and "protein" not in categories_present:
-                return False
-            if category_requirements.get("require_dairy", False) and "dairy" not in categories_present:
-                return False
-            
-            return True
-        
-        # Enumerate all possible dish combinations (select from candidate dishes)
-        best_solution = None
-        best_waste_rate = float('inf')
-        best_combination = None
-        
-        # Try all possible dish combinations
-        for dish_combination in combinations(candidate_dishes, num_dishes):
-            # Check category requirements
-            if not check_category_requirements_func(dish_combination):
-                continue
-            
-            # Set up linear programming for current combination
-            n_selected = len(dish_combination)
-            selected_waste_rates = []
-            
-            for dish in dish_combination:
-                # Find corresponding waste rate
-                dish_idx = candidate_dishes.index(dish)
-                selected_waste_rates.append(candidate_waste_rates[dish_idx])
-            
-            # Linear programming setup
-            # Objective function: minimize total waste amount
-            c = selected_waste_rates
-            
-            # Inequality constraints A_ub * x <= b_ub
-            A_ub = []
-            b_ub = []
-            
-            # Maximum quantity constraint for each dish
-            for i, dish in enumerate(dish_combination):
-                dish_id_str = str(dish.id)
-                constraint = dish_constraints[dish_id_str]
-                max_qty = constraint["max"]
-                
-                constraint_row = [0] * n_selected
-                constraint_row[i] = 1
-                A_ub.append(constraint_row)
-                b_ub.append(max_qty)
-            
-            # Total quantity upper bound constraint
-            A_ub.append([1] * n_selected)
-            b_ub.append(total_qty_max)
-            
-            # Total quantity lower bound constraint (convert to inequality)
-            A_ub.append([-1] * n_selected)
-            b_ub.append(-total_qty_min)
-            
-            # Variable bounds (lower bound, upper bound)
-            bounds = []
-            for dish in dish_combination:
-                dish_id_str = str(dish.id)
-                constraint = dish_constraints[dish_id_str]
-                min_qty = constraint["min"]
-                bounds.append((min_qty, None))  # Upper bound handled by inequality constraints
-            
-            # Solve linear programming
-            try:
-                result = linprog(
-                    c=c,
-                    A_ub=A_ub,
-                    b_ub=b_ub,
-                    bounds=bounds,
-                    method='highs'
-                )
-                
-                if result.success and result.x is not None:
-                    quantities = result.x
-                    total_quantity = sum(quantities)
-                    
-                    # Validate if solution satisfies all constraints
-                    valid_solution = True
-                    
-                    # Check total quantity constraints
-                    if total_quantity < total_qty_min or total_quantity > total_qty_max:
-                        valid_solution = False
-                    
-                    # Check constraints for each dish
-                    for i, dish in enumerate(dish_combination):
-                        dish_id_str = str(dish.id)
-                        constraint = dish_constraints[dish_id_str]
-                        if quantities[i] < constraint["min"] or quantities[i] > constraint["max"]:
-                            valid_solution = False
-                            break
-                    
-                    if valid_solution:
-                        total_waste = sum(quantities[i] * selected_waste_rates[i] for i in range(n_selected))
-                        waste_rate = total_waste / total_quantity if total_quantity > 0 else 0
-                        
-                        if waste_rate < best_waste_rate:
-                            best_waste_rate = waste_rate
-                            best_combination = dish_combination
-                            best_solution = {
-                                "quantities": quantities,
-                                "total_quantity": total_quantity,
-                                "total_waste": total_waste,
-                                "waste_rate": waste_rate,
-                                "status": result.message
-                            }
-                            
-            except Exception as e:
-                # This combination has no solution, continue to next one
-                continue
-        
-        if best_solution is None:
-            return jsonify({"error": "No valid solution found. Constraints may be too restrictive."}), 400
-        
-        # Build response
-        selected_dishes_result = []
-        for i, dish in enumerate(best_combination):
-            dish_idx = candidate_dishes.index(dish)
-            image_path = dish.image_path if dish.image_path else f"/images/{dish.name}.png"
-            selected_dishes_result.append({
-                "dish_id": dish.id,
-                "dish_name": dish.name,
-                "category": dish.category or "unknown",
-                "quantity": round(best_solution["quantities"][i], 2),
-                "predicted_waste": round(best_solution["quantities"][i] * candidate_waste_rates[dish_idx], 2),
-                "image_path": image_path
-            })
-        
-        result = {
-            "success": True,
-            "optimization_result": {
-                "selected_dishes": selected_dishes_result,
-                "total_quantity": round(best_solution["total_quantity"], 2),
-                "total_predicted_waste": round(best_solution["total_waste"], 2),
-                "waste_rate": round(best_solution["waste_rate"], 4),
-                "optimization_status": "optimal"
-            }
+            constraint = dish_constraints[dish_id_str]
+            if "min" not in constraint or "max" not in constraint:
+                invalid_constraints.append(f"Dish {dish_id_str} missing min or max constraint")
+            elif constraint["min"] >= constraint["max"]:
+                invalid_constraints.append(f"Dish {dish_id_str} invalid constraint: min must be less than max")
+    
+    if missing_constraints:
+        return jsonify({
+            "error": f"Missing dish_constraints for candidate dishes: {missing_constraints}. "
+                    f"All candidate dishes must have constraints defined."
+        }), 400
+    
+    if invalid_constraints:
+        return jsonify({"error": f"Invalid constraints: {invalid_constraints}"}), 400
+    
+    # Check if candidate dish count is sufficient
+    if len(candidate_dishes) < num_dishes:
+        return jsonify({
+            "error": f"Not enough candidate dishes. Need {num_dishes}, have {len(candidate_dishes)} candidate dishes"
+        }), 400
+    
+    # Encode category requirements as a bitmask so the per-combination
+    # check is integer ORs instead of building a set of category strings
+    required_mask = 0
+    for flag, category in (("require_staple", "staple"),
+                           ("require_vegetable", "vegetable"),
+                           ("require_protein", "protein"),
+                           ("require_dairy", "dairy")):
+        if category_requirements.get(flag, False):
+            required_mask |= _CATEGORY_BITS[category]
+    cand_bits = [_CATEGORY_BITS.get(d.category, 0) for d in candidate_dishes]
+
+    # Candidate constraint data as NumPy arrays built once, so each
+    # combination's LP setup is array slicing instead of per-dish
+    # dict/list work inside the enumeration loop
+    cand_waste = np.asarray(candidate_waste_rates, dtype=np.float64)
+    cand_mins = np.asarray(
+        [dish_constraints[str(d.id)]["min"] for d in candidate_dishes], dtype=np.float64)
+    cand_maxs = np.asarray(
+        [dish_constraints[str(d.id)]["max"] for d in candidate_dishes], dtype=np.float64)
+
+    # Enumerate all possible dish combinations (select from candidate dishes).
+    # The selection could be folded into a single MILP with binary pick
+    # variables, but the objective minimized here is a waste *rate*
+    # (waste/total) — a fractional objective a linear MILP cannot express
+    # without fixing the total — so exhaustive enumeration keeps the true
+    # objective and stays cheap for realistic candidate pool sizes.
+    # The whole sweep runs as batched NumPy: one (C, k) index matrix, fancy
+    # gathers, and row-wise closed-form fills — no per-combination Python.
+    best_solution = None
+    best_idx = None
+
+    n_candidates = len(candidate_dishes)
+    combos = np.fromiter(
+        chain.from_iterable(combinations(range(n_candidates), num_dishes)),
+        dtype=np.intp,
+    ).reshape(-1, num_dishes)
+
+    # Category requirements: the OR of each row's category bits must cover
+    # every required bit
+    if required_mask:
+        row_masks = np.bitwise_or.reduce(
+            np.asarray(cand_bits, dtype=np.int64)[combos], axis=1)
+        combos = combos[(row_masks & required_mask) == required_mask]
+
+    if combos.size:
+        mn = cand_mins[combos]
+        mx = cand_maxs[combos]
+        w = cand_waste[combos]
+        smin = mn.sum(axis=1)
+        # Keep rows whose box extremes can reach the total window
+        feasible = (smin <= total_qty_max) & (mx.sum(axis=1) >= total_qty_min)
+        combos, mn, mx, w, smin = (
+            combos[feasible], mn[feasible], mx[feasible], w[feasible], smin[feasible])
+
+    if combos.size:
+        # Closed-form solve (the former per-combination LP): with only box
+        # bounds plus one total-quantity interval and non-negative rates,
+        # minimal waste is every dish at its minimum, topped up to the
+        # total lower bound by pouring the shortfall into the
+        # lowest-waste-rate dishes first — a continuous knapsack, done
+        # here for every row at once
+        rows = np.arange(combos.shape[0])[:, None]
+        order = np.argsort(w, axis=1, kind='stable')
+        room = (mx - mn)[rows, order]
+        shortfall = np.maximum(total_qty_min - smin, 0.0)
+        # Room available in cheaper slots before each sorted slot
+        prior = np.cumsum(room, axis=1) - room
+        poured = np.clip(shortfall[:, None] - prior, 0.0, room)
+        quantities = mn.copy()
+        quantities[rows, order] += poured
+
+        totals = quantities.sum(axis=1)
+        waste = (quantities * w).sum(axis=1)
+        rates = np.divide(waste, totals, out=np.zeros_like(waste),
+                          where=totals > 0)
+
+        bi = int(np.argmin(rates))
+        best_idx = combos[bi].tolist()
+        best_solution = {
+            "quantities": quantities[bi],
+            "total_quantity": float(totals[bi]),
+            "total_waste": float(waste[bi]),
+            "waste_rate": float(rates[bi])
         }
-        
-        return jsonify(result)
+
+    if best_solution is None:
+        return jsonify({"error": "No valid solution found. Constraints may be too restrictive."}), 400
+    
+    # Build response — per-dish waste and rounding as single vector ops
+    best_combination = [candidate_dishes[i] for i in best_idx]
+    quantities = np.asarray(best_solution["quantities"])
+    predicted_waste = np.round(quantities * cand_waste[best_idx], 2).tolist()
+    quantities_rounded = np.round(quantities, 2).tolist()
+
+    selected_dishes_result = [
+        {
+            "dish_id": dish.id,
+            "dish_name": dish.name,
+            "category": dish.category or "unknown",
+            "quantity": quantity,
+            "predicted_waste": waste,
+            "image_path": image_path_for(dish.name, dish.image_path)
+        }
+        for dish, quantity, waste in zip(
+            best_combination, quantities_rounded, predicted_waste)
+    ]
+    
+    result = {
+        "success": True,
+        "optimization_result": {
+            "selected_dishes": selected_dishes_result,
+            "total_quantity": round(best_solution["total_quantity"], 2),
+            "total_predicted_waste": round(best_solution["total_waste"], 2),
+            "waste_rate": round(best_solution["waste_rate"], 4),
+            "optimization_status": "optimal"
+        }
+    }
     
-    except Exception as e:
-        return jsonify({"error": f"Failed to optimize menu: {str(e)}"}), 500
+    return jsonify(result)
+
 
 
 # ==========================================================
@@ -1024,76 +1262,73 @@ def waste_trend_chart():
     from matplotlib.dates import DateFormatter
     import matplotlib.dates as mdates
     
+    data = request.get_json()
+    
+    if not data or "start_date" not in data or "end_date" not in data:
+        return jsonify({"error": "Missing required fields: start_date, end_date"}), 400
+    
     try:
-        data = request.get_json()
-        
-        if not data or "start_date" not in data or "end_date" not in data:
-            return jsonify({"error": "Missing required fields: start_date, end_date"}), 400
-        
-        try:
-            start_date = datetime.strptime(data["start_date"], "%Y-%m-%d").date()
-            end_date = datetime.strptime(data["end_date"], "%Y-%m-%d").date()
-        except ValueError:
-            return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
-        
-        if start_date > end_date:
-            return jsonify({"error": "start_date must be before or equal to end_date"}), 400
-        
-        # Get days in date range
-        days = Day.query.filter(Day.date >= start_date, Day.date <= end_date).order_by(Day.date).all()
-        
-        if not days:
-            return jsonify({"error": "No data found for the specified date range"}), 404
-        
-        # Calculate daily waste rates
-        dates = []
-        waste_rates = []
-        
-        for day in days:
-            servings = Serving.query.filter_by(day_id=day.id).all()
-            if servings:
-                total_serving = sum(serving.quantity for serving in servings)
-                if total_serving > 0:
-                    daily_waste_rate = day.total_waste / total_serving
-                    dates.append(day.date)
-                    waste_rates.append(daily_waste_rate)
-        
-        # Create chart
-        plt.figure(figsize=(12, 6))
-        plt.plot(dates, waste_rates, marker='o', linewidth=2, markersize=6)
-        plt.title(f'Waste Rate Trend ({start_date} to {end_date})', fontsize=14, fontweight='bold')
-        plt.xlabel('Date', fontsize=12)
-        plt.ylabel('Waste Rate', fontsize=12)
-        plt.grid(True, alpha=0.3)
-        
-        # Format x-axis
-        plt.gca().xaxis.set_major_formatter(DateFormatter('%m-%d'))
-        plt.gca().xaxis.set_major_locator(mdates.DayLocator(interval=1))
-        plt.xticks(rotation=45)
-        
-        # Adjust layout and save to base64
-        plt.tight_layout()
-        
-        # Save plot to base64 string
-        img_buffer = io.BytesIO()
-        plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
-        img_buffer.seek(0)
-        img_base64 = base64.b64encode(img_buffer.read()).decode('utf-8')
-        plt.close()
-        
-        return jsonify({
-            "success": True,
-            "chart_data": {
-                "image_base64": img_base64,
-                "dates": [d.isoformat() for d in dates],
-                "waste_rates": [round(rate, 4) for rate in waste_rates],
-                "date_range": f"{start_date} to {end_date}",
-                "total_days": len(dates)
-            }
-        })
+        start_date = date.fromisoformat(data["start_date"])
+        end_date = date.fromisoformat(data["end_date"])
+    except ValueError:
+        return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
+    
+    if start_date > end_date:
+        return jsonify({"error": "start_date must be before or equal to end_date"}), 400
+    
+    # Get days in date range
+    days = Day.query.filter(Day.date >= start_date, Day.date <= end_date).order_by(Day.date).all()
     
-    except Exception as e:
-        return jsonify({"error": f"Failed to generate chart: {str(e)}"}), 500
+    if not days:
+        return jsonify({"error": "No data found for the specified date range"}), 404
+    
+    # Calculate daily waste rates
+    dates = []
+    waste_rates = []
+    
+    for day in days:
+        servings = Serving.query.filter_by(day_id=day.id).all()
+        if servings:
+            total_serving = sum(serving.quantity for serving in servings)
+            if total_serving > 0:
+                daily_waste_rate = day.total_waste / total_serving
+                dates.append(day.date)
+                waste_rates.append(daily_waste_rate)
+    
+    # Create chart
+    plt.figure(figsize=(12, 6))
+    plt.plot(dates, waste_rates, marker='o', linewidth=2, markersize=6)
+    plt.title(f'Waste Rate Trend ({start_date} to {end_date})', fontsize=14, fontweight='bold')
+    plt.xlabel('Date', fontsize=12)
+    plt.ylabel('Waste Rate', fontsize=12)
+    plt.grid(True, alpha=0.3)
+    
+    # Format x-axis
+    plt.gca().xaxis.set_major_formatter(DateFormatter('%m-%d'))
+    plt.gca().xaxis.set_major_locator(mdates.DayLocator(interval=1))
+    plt.xticks(rotation=45)
+    
+    # Adjust layout and save to base64
+    plt.tight_layout()
+    
+    # Save plot to base64 string
+    img_buffer = io.BytesIO()
+    plt.savefig(img_buffer, format='png', dpi=150, bbox_inches='tight')
+    img_buffer.seek(0)
+    img_base64 = base64.b64encode(img_buffer.read()).decode('utf-8')
+    plt.close()
+    
+    return jsonify({
+        "success": True,
+        "chart_data": {
+            "image_base64": img_base64,
+            "dates": [d.isoformat() for d in dates],
+            "waste_rates": np.round(waste_rates, 4).tolist(),
+            "date_range": f"{start_date} to {end_date}",
+            "total_days": len(dates)
+        }
+    })
+
 
 
 # ==========================================================
@@ -1102,4 +1337,16 @@ def waste_trend_chart():
 if __name__ == "__main__":
     with app.app_context():
         db.create_all()
+        # create_all skips tables that already exist, so databases created
+        # before the indexes were declared in models.py never get them —
+        # add the hot-path indexes explicitly (no-ops when present)
+        with db.engine.connect() as conn:
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_serving_day_dish "
+                "ON servings (day_id, dish_id)"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_days_date ON days (date)"))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_dishes_name ON dishes (name)"))
+            conn.commit()
     app.run(debug=True, host='0.0.0.0', port=5001)
@@ -8,7 +8,8 @@ class Dish(db.Model):
     __tablename__ = "dishes"
 
     id = db.Column(db.Integer, primary_key=True)
-    name = db.Column(db.String(64), nullable=False)
+    # add_day looks dishes up by name, so keep it unique and indexed
+    name = db.Column(db.String(64), nullable=False, unique=True, index=True)
     image_path = db.Column(db.String(256), nullable=True)  # 菜品图片路径
     
     # 菜品类别（主食、蔬菜、蛋肉类、奶制品）
@@ -31,7 +32,7 @@ class Day(db.Model):
     __tablename__ = "days"
 
     id = db.Column(db.Integer, primary_key=True)
-    date = db.Column(db.Date, unique=True, default=date.today)
+    date = db.Column(db.Date, unique=True, index=True, default=date.today)
 
     # 当天的总厨余垃圾重量（一对一）
     total_waste = db.Column(db.Float, nullable=False)
@@ -50,6 +51,8 @@ class Day(db.Model):
 # ========== 3. 每天每个菜品的投放量 ==========
 class Serving(db.Model):
     __tablename__ = "servings"
+    # Hot queries filter by day_id (and sometimes dish_id) — index the pair
+    __table_args__ = (db.Index("ix_serving_day_dish", "day_id", "dish_id"),)
 
     id = db.Column(db.Integer, primary_key=True)
 
@@ -60,7 +63,9 @@ class Serving(db.Model):
     dish_id = db.Column(db.Integer, db.ForeignKey("dishes.id"), nullable=False)
 
     # 当天此菜品的投放数量
-    quantity = db.Column(db.Integer, nullable=False)
+    # Float, not Integer: rebuild_db and add_day both write fractional
+    # quantities, and the declared type should match what is stored
+    quantity = db.Column(db.Float, nullable=False)
 
     def to_dict(self):
         return {
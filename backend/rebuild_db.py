@@ -74,53 +74,62 @@ def rebuild_database():
         
         # Create 7 days of data (Nov 10-16, 2025)
         start_date = date(2025, 11, 10)
-        
+
+        days = []
+        daily_servings = []  # servings_data per day, aligned with days
+
         for day_offset in range(7):
             current_date = start_date + timedelta(days=day_offset)
-            
+
             # Select 6 dishes randomly for each day
             available_dish_ids = list(range(1, 9))  # IDs 1-8
             selected_dish_ids = sorted(random.sample(available_dish_ids, 6))
-            
+
             # Generate serving quantities (20-50 units per dish)
             servings_data = []
             total_waste = 0
-            
+
             for dish_id in selected_dish_ids:
                 # Random serving quantity between 20-50
                 quantity = round(random.uniform(20, 50), 2)
-                
+
                 # Calculate waste based on fixed waste rate
                 waste_rate = dish_waste_rates[dish_id]
                 dish_waste = quantity * waste_rate
                 total_waste += dish_waste
-                
+
                 servings_data.append({
                     "dish_id": dish_id,
                     "quantity": quantity,
                     "waste": dish_waste
                 })
-            
+
             # Round total waste to 2 decimal places
             total_waste = round(total_waste, 2)
-            
-            # Create Day record
-            day = Day(date=current_date, total_waste=total_waste)
-            db.session.add(day)
-            db.session.flush()  # Get day ID
-            
-            # Create Serving records
-            for serving_data in servings_data:
-                serving = Serving(
-                    day_id=day.id,
-                    dish_id=serving_data["dish_id"],
-                    quantity=serving_data["quantity"]
-                )
-                db.session.add(serving)
-            
+
+            days.append(Day(date=current_date, total_waste=total_waste))
+            daily_servings.append(servings_data)
+
             print(f"Day {current_date}: {len(selected_dish_ids)} dishes, total waste: {total_waste}kg")
             print(f"  Dishes: {[dishes[i-1].name for i in selected_dish_ids]}")
-        
+
+        # Insert all days with one flush, then all servings with a single
+        # multi-row INSERT instead of one statement per record
+        db.session.add_all(days)
+        db.session.flush()  # Get day IDs
+
+        serving_rows = [
+            {
+                "day_id": day.id,
+                "dish_id": serving_data["dish_id"],
+                "quantity": serving_data["quantity"]
+            }
+            for day, servings_data in zip(days, daily_servings)
+            for serving_data in servings_data
+        ]
+        if serving_rows:
+            db.session.execute(Serving.__table__.insert(), serving_rows)
+
         # Commit all changes
         db.session.commit()
         print("\nDatabase successfully rebuilt!")